@@ -19,13 +19,23 @@ Run:
 """
 
 import asyncio
+import concurrent.futures
+import functools
+import inspect
+import json
+import math
+import os
+import queue
 import re
 import threading
+import types
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from typing import Optional, Literal, List, Dict, Any, Tuple
+from typing import Optional, Literal, List, Dict, Any, Tuple, Union
+from urllib.parse import SplitResult, urlsplit
 
 # GUI
 import tkinter as tk
@@ -34,8 +44,29 @@ from tkinter import ttk, filedialog, messagebox
 # Playwright
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
-# Imaging/PDF for screenshot mode
-from PIL import Image
+def _disable_playwright_stack_capture():
+    """
+    Older Playwright releases call inspect.stack() on every API call to annotate traces,
+    which resolves source lines for every frame. We never record traces, so hand those
+    modules an `inspect` whose stack() is empty. Set PW_INSPECT_STACK=1 to keep the default.
+    """
+    if os.environ.get("PW_INSPECT_STACK", "0") != "0":
+        return
+    import importlib
+    shim = types.ModuleType("inspect")
+    shim.__dict__.update(inspect.__dict__)
+    shim.stack = lambda *args, **kwargs: []
+    for name in ("_connection", "_impl_to_api_mapping", "_api_types"):
+        try:
+            mod = importlib.import_module(f"playwright._impl.{name}")
+        except Exception:
+            continue
+        if getattr(mod, "inspect", None) is inspect:
+            mod.inspect = shim
+
+_disable_playwright_stack_capture()
+
+# PDF for screenshot mode (reportlab's ImageReader needs Pillow installed)
 from reportlab.pdfgen import canvas as pdfcanvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
@@ -49,28 +80,30 @@ PDF_POINTS_PER_INCH = 72.0
 def csspx_to_pdfpt(px: float) -> float:
     return px * (PDF_POINTS_PER_INCH / CSS_PX_PER_INCH)
 
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*' + "".join(map(chr, range(0x20))), "_"))
+_URL_PART_TABLE = str.maketrans("./", "__")
+
 def sanitize_filename_component(s: str) -> str:
-    s = s.strip()
-    s = re.sub(r'[<>:"/\\|?*\x00-\x1F]+', '_', s)
-    s = re.sub(r'_+', '_', s)
-    s = s.strip('_')
+    s = s.strip().translate(_SANITIZE_TABLE)
+    s = "_".join(part for part in s.split("_") if part)  # collapse runs, trim ends
     return s or "file"
 
-def url_to_filename(url: str) -> str:
+@functools.lru_cache(maxsize=1024)
+def url_to_filename(url: Union[str, SplitResult]) -> str:
     """
-    Build example_com_directory_filename_htm.pdf from a URL.
-    Dots/slashes -> underscores; strip query/fragment.
+    Build example_com_directory_filename_htm.pdf from a URL (string or pre-split).
+    Dots/slashes -> underscores; strip query/fragment and ;params of the last segment (as urlparse did).
     """
-    from urllib.parse import urlparse
-    parsed = urlparse(url)
-    host = (parsed.netloc or "site").replace(".", "_")
-    path = parsed.path or "/"
+    parsed = url if isinstance(url, SplitResult) else urlsplit(url)
+    host = (parsed.netloc or "site").translate(_URL_PART_TABLE)
+    head, sep, last = parsed.path.rpartition("/")
+    path = (head + sep + last.split(";", 1)[0]) or "/"
     if path.endswith("/"):
         path = path[:-1]
     if not path:
         path = "/index.html"
     path = path.lstrip("/")
-    path_part = path.replace("/", "_").replace(".", "_")
+    path_part = path.translate(_URL_PART_TABLE)
     base = f"{host}_{path_part}" if path_part else host
     base = sanitize_filename_component(base)
     if not base.lower().endswith(".pdf"):
@@ -82,9 +115,12 @@ def default_timestamped_name(url: str) -> str:
     base = sanitize_filename_component(url)
     return f"{base}_{ts}.pdf"
 
-def host_of(url: str) -> str:
-    from urllib.parse import urlparse
-    return (urlparse(url).netloc or "").lower()
+_URL_RE = re.compile(r'^https?://', re.I)
+
+def host_of(url: Union[str, SplitResult]) -> str:
+    """Lowercased hostname without port or user:pw@ (for site-rule lookup and host grouping)."""
+    parsed = url if isinstance(url, SplitResult) else urlsplit(url)
+    return parsed.hostname or ""
 
 # ---------- CAPTCHA detection ----------
 
@@ -97,34 +133,48 @@ async def detect_captcha(page) -> Dict[str, Any]:
     (() => {
       const signals = [];
       const d = document;
-      const title = (d.title || "").toLowerCase();
-      const bodyText = (d.body ? d.body.innerText : "").toLowerCase();
-
       const sel = (s) => d.querySelector(s);
 
-      if (bodyText.includes("verify you are human")) signals.push("text: verify you are human");
-      if (bodyText.includes("i'm not a robot") || bodyText.includes("im not a robot")) signals.push("text: i'm not a robot");
-      if (bodyText.includes("checking your browser before accessing")) signals.push("text: checking your browser");
-      if (bodyText.includes("complete the security check")) signals.push("text: security check");
-      if (title.includes("just a moment")) signals.push("title: just a moment");
-      if (title.includes("attention required")) signals.push("title: attention required");
-
-      // Cloudflare challenge / Turnstile
+      // Cheap selector probes first
       if (sel("#cf-challenge") || sel("#challenge-form") || sel("#challenge-stage") ||
-          sel("iframe[src*='challenges.cloudflare.com']") || bodyText.includes("cloudflare")) {
+          sel("iframe[src*='challenges.cloudflare.com']")) {
         signals.push("cloudflare selectors");
       }
-
-      // reCAPTCHA
-      if (sel("iframe[src*='www.google.com/recaptcha']") || sel(".g-recaptcha") || bodyText.includes("recaptcha")) {
+      if (sel("iframe[src*='www.google.com/recaptcha']") || sel(".g-recaptcha")) {
         signals.push("recaptcha selectors");
       }
-
-      // hCaptcha
-      if (sel("iframe[src*='hcaptcha.com']") || bodyText.includes("hcaptcha")) {
+      if (sel("iframe[src*='hcaptcha.com']")) {
         signals.push("hcaptcha selectors");
       }
 
+      // Text scan only when no selector hit; gates put their message at the top,
+      // so the first 4 KB of visible text is enough and avoids materializing innerText.
+      // Script/style/noscript text is skipped: inline grecaptcha calls are not a gate.
+      if (signals.length === 0) {
+        const title = (d.title || "").toLowerCase();
+        let bodyText = "";
+        if (d.body) {
+          const walker = d.createTreeWalker(d.body, NodeFilter.SHOW_TEXT, {
+            acceptNode(n) {
+              const tag = n.parentNode && n.parentNode.nodeName;
+              return (tag === "SCRIPT" || tag === "STYLE" || tag === "NOSCRIPT")
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT;
+            }
+          });
+          while (bodyText.length < 4096 && walker.nextNode()) bodyText += walker.currentNode.nodeValue + " ";
+          bodyText = bodyText.substring(0, 4096).toLowerCase();
+        }
+        if (bodyText.includes("verify you are human")) signals.push("text: verify you are human");
+        if (bodyText.includes("i'm not a robot") || bodyText.includes("im not a robot")) signals.push("text: i'm not a robot");
+        if (bodyText.includes("checking your browser before accessing")) signals.push("text: checking your browser");
+        if (bodyText.includes("complete the security check")) signals.push("text: security check");
+        if (title.includes("just a moment")) signals.push("title: just a moment");
+        if (title.includes("attention required")) signals.push("title: attention required");
+        if (bodyText.includes("cloudflare")) signals.push("cloudflare text");
+        if (bodyText.includes("recaptcha")) signals.push("recaptcha text");
+        if (bodyText.includes("hcaptcha")) signals.push("hcaptcha text");
+      }
+
       const found = signals.length > 0;
       let provider = "unknown";
       if (signals.some(s => s.includes("cloudflare"))) provider = "cloudflare";
@@ -142,6 +192,11 @@ async def detect_captcha(page) -> Dict[str, Any]:
         pass
     return {"found": False, "provider": "unknown", "signals": []}
 
+# Small dedicated pool for blocking waits (the CAPTCHA dialog's threading.Event), so they
+# never compete with asyncio.to_thread work in the loop's default executor.
+# Its threads are joined at interpreter exit, so App.on_close releases any pending prompt.
+_BLOCKING_EXEC = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="w2pdf-blk")
+
 async def apply_storage_state_to_context(context, storage_state: Dict[str, Any], logcb=print):
     """
     Apply only cookies from a storage_state dict to an existing context.
@@ -158,128 +213,157 @@ async def apply_storage_state_to_context(context, storage_state: Dict[str, Any],
 
 # ---------- Page preparation helpers ----------
 
-async def wait_for_fonts_and_images(page, timeout_ms: int = 15000, logcb=print):
-    try:
-        await page.evaluate("""async () => { if (document.fonts && document.fonts.ready) { await document.fonts.ready; } }""", timeout=timeout_ms)
-    except Exception:
-        pass
-    try:
-        await page.wait_for_function("""() => Array.from(document.images).every(img => img.complete)""", timeout=timeout_ms)
-    except Exception:
-        pass
-
-async def gentle_autoscroll(page, step: int = 1200, stall_ms: int = 400, max_ms: int = 20000, logcb=print):
-    """
-    Scrolls down to trigger lazy-loading, then returns to top.
-    """
-    try:
-        last_h = await page.evaluate("() => document.documentElement.scrollHeight")
-    except Exception:
-        last_h = None
-
-    elapsed = 0
-    while elapsed < max_ms:
-        try:
-            await page.evaluate("(s) => window.scrollBy(0, s)", step)
-        except Exception:
-            break
-        await page.wait_for_timeout(stall_ms)
-        elapsed += stall_ms
-        try:
-            new_h = await page.evaluate("() => document.documentElement.scrollHeight")
-        except Exception:
-            break
-        if last_h is not None and new_h <= last_h:
-            await page.wait_for_timeout(500)
-            break
-        last_h = new_h
-    try:
-        await page.evaluate("() => window.scrollTo(0, 0)")
-    except Exception:
-        pass
-
-async def dismiss_cookie_banners(page, logcb=print):
-    """
-    Clicks common accept buttons; removes remaining cookie/consent overlays.
-    """
-    BUTTON_XPATHS = [
-        "//button[.//text()[matches(., '(?i)accept( all)?|agree|got it|i understand|continue')]]",
-        "//a[.//text()[matches(., '(?i)accept( all)?|agree|got it|i understand|continue')]]",
-        "//*[@id='onetrust-accept-btn-handler']",
-        "//*[@id='onetrust-reject-all-handler']",
-        "//*[@data-action='accept']",
-        "//*[@data-didomi-accept-button]",
-        "//*[@class[contains(., 'qc-cmp')]]",
-    ]
-    for xp in BUTTON_XPATHS:
-        try:
-            btns = await page.locator(f"xpath={xp}").all()
-            for b in btns:
-                try:
-                    if await b.is_visible():
-                        await b.click(timeout=1500)
-                        logcb("[cookie] Clicked consent button")
-                        await page.wait_for_timeout(250)
-                except Exception:
-                    pass
-        except Exception:
-            pass
+CONSENT_SELECTORS = [
+    "[id*='onetrust']","[class*='onetrust']","[id*='cmp']","[class*='cmp']",
+    "[id*='consent']","[class*='consent']","[id*='cookie']","[class*='cookie']",
+    "[aria-label*='cookie' i]","[role='dialog'] [class*='cookie']","[role='dialog'][id*='cookie']",
+    "div[style*='position: fixed']","div[class*='sticky']","div[id*='sticky']",
+    "footer[style*='position: fixed']",
+]
+
+# Accept/dismiss buttons clicked directly; text-matched buttons are only clicked inside
+# consent-looking containers so generic "Continue" buttons elsewhere are left alone.
+CONSENT_BUTTON_SELECTORS = [
+    "#onetrust-accept-btn-handler", "#onetrust-reject-all-handler",
+    "[data-action='accept']", "[data-didomi-accept-button]",
+    "[class*='qc-cmp'] button[mode='primary']",
+]
+# Containers whose buttons may be clicked by label. Explicit cookie/consent names only: generic
+# dialogs and 'cmp' classes (AEM components are cmp-*) would let "Continue" submit a real form.
+CONSENT_SCOPE_SELECTOR = (
+    "[id*='cookie' i],[class*='cookie' i],[id*='consent' i],[class*='consent' i],"
+    "[id*='gdpr' i],[class*='gdpr' i],[id^='onetrust' i],[class*='qc-cmp' i],[id*='didomi' i],"
+    "[id*='usercentrics' i],[aria-label*='cookie' i],[aria-label*='consent' i]"
+)
+
+# Registered on every context: counts IntersectionObserver constructions so PREPARE_JS
+# can tell script-driven lazy loading apart from static pages.
+LAZY_PROBE_INIT_JS = r"""
+(() => {
+  const IO = window.IntersectionObserver;
+  if (!IO) return;
+  window.__w2pdfObservers = 0;
+  window.IntersectionObserver = class extends IO {
+    constructor(...args) { super(...args); window.__w2pdfObservers++; }
+  };
+})();
+"""
 
-    SELECTORS = [
-        "[id*='onetrust']","[class*='onetrust']","[id*='cmp']","[class*='cmp']",
-        "[id*='consent']","[class*='consent']","[id*='cookie']","[class*='cookie']",
-        "[aria-label*='cookie' i]","[role='dialog'] [class*='cookie']","[role='dialog'][id*='cookie']",
-        "div[style*='position: fixed']","div[class*='sticky']","div[id*='sticky']",
-        "footer[style*='position: fixed']",
-    ]
-    script = """
-    (() => {
-      const sels = %s;
-      let removed = 0;
-      for (const sel of sels) {
-        try {
-          const nodes = document.querySelectorAll(sel);
-          nodes.forEach(n => { 
-            if (!n) return;
-            const t = (n.id + ' ' + n.className + ' ' + (n.getAttribute('aria-label')||'')).toLowerCase();
-            if (t.includes('cookie') || t.includes('consent') || t.includes('cmp') || t.includes('onetrust') || t.includes('gdpr') || t.includes('quantcast') || t.includes('didomi')) {
-              n.remove(); removed++;
-            } else {
-              const cs = window.getComputedStyle(n);
-              if (cs && cs.position === 'fixed') {
-                try {
-                  const r = n.getBoundingClientRect();
-                  if (r && r.height >= 40 && r.width >= 200) { n.remove(); removed++; }
-                } catch {}
-              }
-            }
-          });
-        } catch {}
-      }
-      return removed;
+# Fonts/images → lazy-load scroll → consent clicks + overlay removal → unstick bars → measure,
+# all inside the page so preparation costs a single CDP round-trip.
+PREPARE_JS = r"""
+async (o) => {
+  const d = document;
+  const sleep = (ms) => new Promise(r => setTimeout(r, ms));
+  const res = { consentClicked: 0, removedConsent: 0, unstuck: 0, contentHeight: 0 };
+
+  // Global JS (init script): start it now if window load has not fired yet, and let it settle
+  if (window.__w2pdfRunGlobalJs) {
+    try { await Promise.race([window.__w2pdfRunGlobalJs(), sleep(o.readyTimeoutMs)]); } catch {}
+  }
+
+  // Fonts and images, bounded so a stuck resource cannot hang the capture. Always run: the
+  // networkidle wait is capped (see navigate). Off-screen loading=lazy images are skipped, since
+  // they stay incomplete until the lazy-load scroll below reaches them.
+  try {
+    const vh0 = window.innerHeight || 800;
+    const deferred = (img) => img.loading === 'lazy' && (() => {
+      const r = img.getBoundingClientRect();
+      return r.bottom < 0 || r.top > vh0;
     })();
-    """ % (repr(SELECTORS),)
-    try:
-        removed = await page.evaluate(script)
-        if removed:
-            logcb(f"[cookie] Removed {removed} consent/overlay elements")
-    except Exception:
-        pass
-
-async def unstick_headers_and_footers(page, logcb=print):
-    """
-    Convert fixed/sticky elements at the viewport top/bottom into static flow to avoid obscuring content.
-    """
-    js = r"""
-    (() => {
-      let changed = 0;
+    const ready = (async () => {
+      if (d.fonts && d.fonts.ready) { await d.fonts.ready; }
+      await Promise.all(Array.from(d.images).filter(img => !img.complete && !deferred(img)).map(img => new Promise(r => {
+        img.addEventListener('load', r, { once: true });
+        img.addEventListener('error', r, { once: true });
+      })));
+    })();
+    await Promise.race([ready, sleep(o.readyTimeoutMs)]);
+  } catch {}
+
+
+  // Lazy-load: nothing to do for short pages without lazy markers or observers.
+  // Otherwise step down one viewport at a time with one stall per step (native
+  // loading=lazy fetches well ahead of the viewport, so per-element stops are not needed).
+  // Pages with lazy markers/observers are walked to the bottom; plain long pages stop
+  // as soon as a step does not grow the document.
+  try {
+    const de = d.documentElement;
+    const vh = window.innerHeight || 800;
+    const lazy = !!d.querySelector('img[loading="lazy"], iframe[loading="lazy"], [data-src], [data-lazy]')
+      || (window.__w2pdfObservers || 0) > 0;
+    if (lazy || de.scrollHeight > 2 * vh) {
+      const started = Date.now();
+      let lastH = de.scrollHeight;
+      while (Date.now() - started < o.scrollMaxMs) {
+        window.scrollBy(0, vh);
+        await sleep(o.scrollStallMs);
+        const newH = de.scrollHeight;
+        const atBottom = window.scrollY + vh >= newH - 2;
+        if (newH <= lastH && (!lazy || atBottom)) break;
+        lastH = newH;
+      }
+      window.scrollTo(0, 0);
+    }
+  } catch {}
+
+  // Click visible consent buttons, then remove remaining cookie/consent overlays
+  if (o.hideCookieBanners) {
+    try {
+      const visible = (el) => el.offsetParent !== null || getComputedStyle(el).position === 'fixed';
+      const clicked = new Set();
+      const click = (el) => {
+        if (clicked.has(el) || !visible(el)) return;
+        try { el.click(); clicked.add(el); } catch {}
+      };
+      for (const sel of o.consentButtonSelectors) {
+        try { d.querySelectorAll(sel).forEach(click); } catch {}
+      }
+      const label = /\b(accept( all)?|agree|got it|i understand|continue)\b/i;
+      d.querySelectorAll("button, [role='button'], input[type='button'], a:not([href]), a[href='#']")
+        .forEach(el => {
+          const text = ((el.textContent || el.value || '') + '').trim();
+          if (el.form && el.type === 'submit') return;  // would submit a form and navigate away
+          if (text.length <= 40 && label.test(text) && el.closest(o.consentScopeSelector)) click(el);
+        });
+      res.consentClicked = clicked.size;
+      if (clicked.size) { await sleep(250); }
+    } catch {}
+
+    for (const sel of o.consentSelectors) {
+      try {
+        d.querySelectorAll(sel).forEach(n => {
+          if (!n || !n.isConnected) return;
+          const t = (n.id + ' ' + n.className + ' ' + (n.getAttribute('aria-label')||'')).toLowerCase();
+          if (t.includes('cookie') || t.includes('consent') || t.includes('cmp') || t.includes('onetrust') || t.includes('gdpr') || t.includes('quantcast') || t.includes('didomi')) {
+            n.remove(); res.removedConsent++;
+          } else {
+            const cs = window.getComputedStyle(n);
+            if (cs && cs.position === 'fixed') {
+              try {
+                const r = n.getBoundingClientRect();
+                if (r && r.height >= 40 && r.width >= 200) { n.remove(); res.removedConsent++; }
+              } catch {}
+            }
+          }
+        });
+      } catch {}
+    }
+  }
+
+  // Convert fixed/sticky bars at the viewport top/bottom into static flow.
+  // All style/geometry reads happen first, then all writes, so layout is forced once.
+  if (o.unstickBars && d.body) {
+    try {
       const vh = window.innerHeight || 800;
-      const elems = Array.from(document.querySelectorAll('body *'));
-      for (const el of elems) {
-        const cs = getComputedStyle(el);
-        if (!cs) continue;
-        const pos = cs.position;
-        if (pos !== 'fixed' && pos !== 'sticky') continue;
+      const walker = d.createTreeWalker(d.body, NodeFilter.SHOW_ELEMENT, {
+        acceptNode(n) {
+          const p = getComputedStyle(n).position;
+          return (p === 'fixed' || p === 'sticky') ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+        }
+      });
+      const bars = [];
+      for (let el = walker.nextNode(); el; el = walker.nextNode()) {
         const rect = el.getBoundingClientRect();
         const nearTop = rect.top < 20;
         const nearBottom = (vh - rect.bottom) < 20;
@@ -287,70 +371,184 @@ async def unstick_headers_and_footers(page, logcb=print):
         if (rect.width < 200 || rect.height < 32) continue;
         const role = (el.getAttribute('role')||'').toLowerCase();
         if (role === 'dialog' || role === 'alert') continue;
+        bars.push(el);
+      }
+      for (const el of bars) {
         el.style.setProperty('position', 'static', 'important');
         el.style.setProperty('top', 'auto', 'important');
         el.style.setProperty('bottom', 'auto', 'important');
         el.style.setProperty('left', 'auto', 'important');
         el.style.setProperty('right', 'auto', 'important');
         el.style.setProperty('z-index', 'auto', 'important');
-        changed++;
       }
-      return changed;
-    })();
+      res.unstuck = bars.length;
+    } catch {}
+  }
+
+  // Let layout settle, then measure for print sizing
+  await sleep(250);
+  res.contentHeight = Math.max(
+    d.documentElement.scrollHeight,
+    d.body ? d.body.scrollHeight : 0,
+    d.documentElement.getBoundingClientRect().height
+  );
+  return res;
+}
+"""
+
+INIT_ERROR_BINDING = "__w2pdfInitError"  # exposed per context by run_batch; logs Global JS errors
+
+GLOBAL_CSS_INIT_JS = r"""
+(() => {
+  if (window !== window.top) return;
+  const addStyle = () => {
+    const s = document.createElement('style');
+    s.textContent = __CSS__;
+    (document.head || document.documentElement).appendChild(s);
+  };
+  if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', addStyle, { once: true });
+  else addStyle();
+})();
+"""
+
+# window.__w2pdfRunGlobalJs() starts Global JS once and returns its promise; called on window
+# load and again at the top of PREPARE_JS, so capture never begins before it ran and settled.
+# Compiled with the AsyncFunction constructor so a syntax error is reported instead of silently
+# breaking the init script. Like page.evaluate, function-shaped input is invoked.
+GLOBAL_JS_INIT_JS = r"""
+(() => {
+  if (window !== window.top) return;
+  const src = __JS__;
+  const report = (e) => {
+    const send = window.__BINDING__;
+    if (send) send(location.href, String((e && e.stack) || e)); else console.error(e);
+  };
+  const AsyncFunction = (async function () {}).constructor;
+  let started = null;
+  window.__w2pdfRunGlobalJs = () => {
+    if (!started) {
+      started = (async () => {
+        let fn;
+        try { fn = new AsyncFunction('return (\n' + src + '\n);'); }  // expression / function literal
+        catch { try { fn = new AsyncFunction(src); } catch (e) { report(e); return; } }  // statements
+        try {
+          let out = await fn();
+          if (typeof out === 'function') await out();
+        } catch (e) { report(e); }
+      })();
+    }
+    return started;
+  };
+  window.addEventListener('load', () => { window.__w2pdfRunGlobalJs(); }, { once: true });
+})();
+"""
+
+def build_init_scripts(css: str, js: str) -> List[str]:
+    """
+    Context init scripts for Global CSS and Global JS (top frame only), kept separate so a broken
+    JS snippet cannot take the CSS down with it. The CSS goes in as a <style> once the DOM is parsed;
+    the JS starts on window load, or earlier when PREPARE_JS starts it (see GLOBAL_JS_INIT_JS).
+    That is earlier than the old per-page injection, which ran after the fonts/images wait,
+    autoscroll and consent cleanup, so lazy content may not exist yet.
+    Errors, including syntax errors, are reported through INIT_ERROR_BINDING.
+    """
+    scripts = []
+    if css.strip():
+        scripts.append(GLOBAL_CSS_INIT_JS.replace("__CSS__", json.dumps(css)))
+    if js.strip():
+        scripts.append(GLOBAL_JS_INIT_JS.replace("__BINDING__", INIT_ERROR_BINDING).replace("__JS__", json.dumps(js)))
+    return scripts
+
+async def prepare_page_for_capture(page, opts, logcb=print, host: str = "") -> Dict[str, Any]:
     """
+    Applies the per-site CSS/JS matching host, then runs PREPARE_JS in one evaluate.
+    (Global CSS/JS is already in the page via the context init scripts, see build_init_scripts.)
+    Returns PREPARE_JS's result ({'consentClicked', 'removedConsent', 'unstuck', 'contentHeight'}), or {} on failure.
+    """
+    for rule in opts.rules_for(host):
+        if rule.css:
+            try:
+                await page.add_style_tag(content=rule.css)
+                logcb(f"[INJECT] Applied site CSS for {rule.domain}")
+            except Exception as e:
+                logcb(f"[INJECT][WARN] Site CSS for {rule.domain} failed: {e}")
+        if rule.js:
+            try:
+                await page.evaluate(rule.js)
+                logcb(f"[INJECT] Executed site JS for {rule.domain}")
+            except Exception as e:
+                logcb(f"[INJECT][WARN] Site JS for {rule.domain} failed: {e}")
+    logcb("[PREPARE] Fonts/images, lazy-load scroll, overlay cleanup")
     try:
-        count = await page.evaluate(js)
-        if count:
-            logcb(f"[unstick] Converted {count} sticky/fixed bars to static flow")
-    except Exception:
-        pass
-
-async def prepare_page_for_capture(page, opts, logcb=print):
-    logcb("[WAIT] Ensuring fonts/images are loaded")
-    await wait_for_fonts_and_images(page, timeout_ms=min(15000, opts.timeout_ms), logcb=logcb)
-    logcb("[SCROLL] Triggering lazy-load")
-    await gentle_autoscroll(page, logcb=logcb)
-    if opts.hide_cookie_banners:
-        logcb("[CLEAN] Removing cookie/consent overlays")
-        await dismiss_cookie_banners(page, logcb=logcb)
-    if opts.global_css.strip():
-        try:
-            await page.add_style_tag(content=opts.global_css)
-            logcb("[INJECT] Applied Global CSS")
-        except Exception as e:
-            logcb(f"[INJECT][WARN] Global CSS failed: {e}")
-    if opts.global_js.strip():
-        try:
-            await page.evaluate(opts.global_js)
-            logcb("[INJECT] Executed Global JS")
-        except Exception as e:
-            logcb(f"[INJECT][WARN] Global JS failed: {e}")
-    if opts.unstick_bars:
-        logcb("[UNSTICK] Converting sticky/fixed bars to static flow")
-        await unstick_headers_and_footers(page, logcb=logcb)
-    await page.wait_for_timeout(250)
+        res = await page.evaluate(PREPARE_JS, {
+            "readyTimeoutMs": min(15000, opts.timeout_ms),
+            "scrollStallMs": 400,
+            "scrollMaxMs": 20000,
+            "hideCookieBanners": opts.hide_cookie_banners,
+            "consentButtonSelectors": CONSENT_BUTTON_SELECTORS,
+            "consentScopeSelector": CONSENT_SCOPE_SELECTOR,
+            "consentSelectors": CONSENT_SELECTORS,
+            "unstickBars": opts.unstick_bars,
+        })
+    except Exception as e:
+        logcb(f"[PREPARE][WARN] {e}")
+        res = {}
+    if not isinstance(res, dict):
+        res = {}
+    if res.get("consentClicked"):
+        logcb(f"[cookie] Clicked {res['consentClicked']} consent button(s)")
+    if res.get("removedConsent"):
+        logcb(f"[cookie] Removed {res['removedConsent']} consent/overlay elements")
+    if res.get("unstuck"):
+        logcb(f"[unstick] Converted {res['unstuck']} sticky/fixed bars to static flow")
     if opts.delay_ms > 0:
         logcb(f"[DELAY] Extra delay {opts.delay_ms} ms")
         await page.wait_for_timeout(opts.delay_ms)
+    return res
 
 # ---------- PDF builders for Screenshot mode ----------
+# Both build the PDF in memory and write it with write_pdf_bytes; run_batch creates output_dir up front.
+
+PDF_WRITE_BUFFER = 1 << 19  # 512 KiB
+
+def write_pdf_bytes(out_path: Path, data: bytes):
+    with open(out_path, "wb", buffering=PDF_WRITE_BUFFER) as f:
+        f.write(data)
 
-def screenshot_to_singlepage_pdf(png_bytes: bytes, out_path: Path):
-    img = Image.open(BytesIO(png_bytes)).convert("RGB")
-    width_px, height_px = img.size
+class _NamedImage:
+    """
+    ImageReader proxy that drawImage registers under a fixed name. drawImage hashes an
+    ImageReader's fully decoded RGB raster to name it; for anything else it hashes str(image),
+    so the JPEG goes straight to DCTDecode without ever being decoded.
+    """
+    def __init__(self, reader: ImageReader, name: str):
+        self._reader = reader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._reader, attr)
+
+    def __str__(self):
+        return self._name
+
+def screenshot_to_singlepage_pdf(image_bytes: bytes, out_path: Path):
+    img = ImageReader(BytesIO(image_bytes))  # JPEG is embedded as-is (DCTDecode)
+    width_px, height_px = img.getSize()  # header only
     width_pt, height_pt = csspx_to_pdfpt(width_px), csspx_to_pdfpt(height_px)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    c = pdfcanvas.Canvas(str(out_path), pagesize=(width_pt, height_pt))
-    c.drawImage(ImageReader(img), 0, 0, width=width_pt, height=height_pt, mask='auto')
+    buf = BytesIO()
+    c = pdfcanvas.Canvas(buf, pagesize=(width_pt, height_pt))
+    c.drawImage(_NamedImage(img, "screenshot"), 0, 0, width=width_pt, height=height_pt, mask='auto')
     c.showPage()
     c.save()
+    write_pdf_bytes(out_path, buf.getvalue())
 
-def screenshot_to_paginated_letter_pdf(png_bytes: bytes, out_path: Path, margin_in: float = 0.5):
+def screenshot_to_paginated_letter_pdf(image_bytes: bytes, out_path: Path, margin_in: float = 0.5):
     """
     Paginate a tall screenshot raster onto Letter pages with 'normal' margins (top-down placement).
+    The raster is embedded once as a form XObject; each page shows its slice through a clip rect.
     """
-    img = Image.open(BytesIO(png_bytes)).convert("RGB")
-    width_px, height_px = img.size
+    img = ImageReader(BytesIO(image_bytes))  # JPEG is embedded as-is (DCTDecode)
+    width_px, height_px = img.getSize()  # header only
 
     page_w_pt, page_h_pt = letter  # 612x792 pts
     margin_pt = margin_in * inch
@@ -359,29 +557,39 @@ def screenshot_to_paginated_letter_pdf(png_bytes: bytes, out_path: Path, margin_
 
     width_pt_native = csspx_to_pdfpt(width_px)
     scale = content_w_pt / width_pt_native  # output_pt / native_pt
-
-    native_pt_per_page = content_h_pt / scale
-    native_px_per_page = int(native_pt_per_page * (CSS_PX_PER_INCH / PDF_POINTS_PER_INCH))
-    native_px_per_page = max(1, native_px_per_page)
-
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    c = pdfcanvas.Canvas(str(out_path), pagesize=letter)
-
-    y_top_px = 0
-    while y_top_px < height_px:
-        y_bottom_px = min(height_px, y_top_px + native_px_per_page)
-        tile = img.crop((0, y_top_px, width_px, y_bottom_px))
-        tile_h_pt = csspx_to_pdfpt(tile.size[1]) * scale
-        x_pt = margin_pt
-        y_pt = page_h_pt - margin_pt - tile_h_pt
-        c.drawImage(ImageReader(tile), x_pt, y_pt, width=content_w_pt, height=tile_h_pt, mask='auto')
+    full_h_pt = csspx_to_pdfpt(height_px) * scale
+    n_pages = max(1, math.ceil(full_h_pt / content_h_pt - 1e-6))
+
+    buf = BytesIO()
+    c = pdfcanvas.Canvas(buf, pagesize=letter)
+
+    c.beginForm("screenshot", upperx=content_w_pt, uppery=full_h_pt)
+    c.drawImage(_NamedImage(img, "screenshot"), 0, 0, width=content_w_pt, height=full_h_pt, mask='auto')
+    c.endForm()
+
+    for page_index in range(n_pages):
+        c.saveState()
+        clip = c.beginPath()
+        clip.rect(margin_pt, page_h_pt - margin_pt - content_h_pt, content_w_pt, content_h_pt)
+        c.clipPath(clip, stroke=0, fill=0)
+        c.translate(margin_pt, page_h_pt - margin_pt - full_h_pt + page_index * content_h_pt)
+        c.doForm("screenshot")
+        c.restoreState()
         c.showPage()
-        y_top_px = y_bottom_px
 
     c.save()
+    write_pdf_bytes(out_path, buf.getvalue())
 
 # ---------- Per-site overrides parsing ----------
 
+_SITE_RULES_RE = re.compile(
+    r"@domain\s+(?P<domain>[^\s]+)\s+"
+    r"(?:CSS:\s*(?P<css>.*?))?"
+    r"(?:(?:\s+|(?<=\s))JS:\s*(?P<js>.*?))?"  # lookbehind: JS-only blocks, whose newline the domain consumed
+    r"\s*@end",
+    re.IGNORECASE | re.DOTALL,
+)
+
 @dataclass
 class SiteRule:
     domain: str
@@ -399,35 +607,58 @@ def parse_site_rules(text: str) -> List[SiteRule]:
         ...js...
         @end
     """
-    rules: List[SiteRule] = []
-    if not text.strip():
-        return rules
-
-    pattern = re.compile(
-        r"@domain\s+(?P<domain>[^\s]+)\s+"
-        r"(?:CSS:\s*(?P<css>.*?))?"
-        r"(?:\s+JS:\s*(?P<js>.*?))?"
-        r"\s*@end",
-        re.IGNORECASE | re.DOTALL,
-    )
-    for m in pattern.finditer(text):
-        domain = m.group("domain").strip().lower()
-        css = (m.group("css") or "").strip()
-        js = (m.group("js") or "").strip()
-        rules.append(SiteRule(domain=domain, css=css, js=js))
-    return rules
-
-def match_rules_for_host(rules: List[SiteRule], host: str) -> List[SiteRule]:
-    host = (host or "").lower()
-    out = []
-    for r in rules:
-        d = r.domain.lstrip(".")
-        if host == d or host.endswith("." + d):
-            out.append(r)
-    return out
+    return [
+        SiteRule(domain=m.group("domain").strip().lower(),
+                 css=(m.group("css") or "").strip(),
+                 js=(m.group("js") or "").strip())
+        for m in _SITE_RULES_RE.finditer(text)
+    ]
+
+@dataclass
+class SiteRuleIndex:
+    """
+    Reversed-label trie over rule domains: 'www.example.com' walks com → example → www and
+    collects the rules stored on every node passed, i.e. exact-or-subdomain matches.
+    Rules sit under the None key of their node; lookups are memoized per host.
+    """
+    root: Dict[Any, Any] = field(default_factory=dict)
+    _cache: Dict[str, List[SiteRule]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, rules: List[SiteRule]) -> "SiteRuleIndex":
+        index = cls()
+        for order, rule in enumerate(rules):
+            node = index.root
+            for label in reversed(rule.domain.lstrip(".").split(".")):
+                node = node.setdefault(label, {})
+            node.setdefault(None, []).append((order, rule))
+        return index
+
+    def match(self, host: str) -> List[SiteRule]:
+        host = (host or "").lower()
+        hit = self._cache.get(host)
+        if hit is None:
+            found = []
+            node = self.root
+            for label in reversed(host.split(".")):
+                node = node.get(label)
+                if node is None:
+                    break
+                found.extend(node.get(None, ()))
+            found.sort(key=lambda pair: pair[0])  # keep the order rules were written in
+            hit = self._cache[host] = [rule for _, rule in found]
+        return hit
 
 # ---------- Modes ----------
 
+# Keep headless renderers at full speed: no GPU process, no throttled timers or backgrounded tabs.
+DEFAULT_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
 @dataclass
 class CaptureOptions:
     mode: Literal["screenshot", "print"] = "screenshot"
@@ -435,7 +666,7 @@ class CaptureOptions:
     viewport_width: int = 1366
     dpr: float = 1.0
     delay_ms: int = 0
-    wait_until: Literal["load", "domcontentloaded", "networkidle"] = "networkidle"
+    wait_until: Literal["load", "domcontentloaded", "networkidle"] = "load"
     user_agent: Optional[str] = None
     timeout_ms: int = 45000
     no_sandbox: bool = False
@@ -446,78 +677,252 @@ class CaptureOptions:
     global_css: str = ""
     global_js: str = ""
     site_rules: List[SiteRule] = field(default_factory=list)
+    concurrency: int = 4  # URLs captured in parallel, one long-lived BrowserContext each
+    jpeg_quality: int = 85  # screenshot mode captures JPEG, embedded in the PDF without re-encoding
+    block_trackers: bool = True  # abort analytics/ad/pixel subresources (see _BLOCKED_RE)
+    block_media_fonts: bool = False  # also abort media and web-font subresources
+    init_scripts: List[str] = field(default_factory=list)  # Global CSS/JS context init scripts; built if empty
+    chromium_args: List[str] = field(default_factory=lambda: list(DEFAULT_CHROMIUM_ARGS))  # extra headless launch flags
+    site_index: Optional[SiteRuleIndex] = field(default=None, repr=False)  # built from site_rules if not given
+
+    def __post_init__(self):
+        if not self.init_scripts:
+            self.init_scripts = build_init_scripts(self.global_css, self.global_js)
+        if self.site_index is None:
+            self.site_index = SiteRuleIndex.build(self.site_rules)
+
+    def rules_for(self, host: str) -> List[SiteRule]:
+        return self.site_index.match(host)
 
 # ---------- Core async capture ----------
 
+def build_print_pdf_kwargs(opts: CaptureOptions, content_height_px: float) -> Dict[str, Any]:
+    """
+    page.pdf() arguments: one exact-size page when requested and short enough, else Letter.
+    content_height_px comes from PREPARE_JS; when unknown (0) Letter is used.
+    No path: the caller takes the bytes and writes them with write_pdf_bytes.
+    """
+    pdf_kwargs = {
+        "print_background": True,
+        "margin": {"top": "0.5in", "right": "0.5in", "bottom": "0.5in", "left": "0.5in"},
+        "prefer_css_page_size": False,
+        "scale": 1.0,
+        "display_header_footer": False,
+        "format": "Letter",
+    }
+    if opts.exact_single_page and content_height_px:
+        content_height_in = float(content_height_px) / CSS_PX_PER_INCH
+        content_width_in = float(opts.viewport_width) / CSS_PX_PER_INCH
+        if content_height_in <= 199.0:
+            pdf_kwargs["margin"] = {"top": "0in", "right": "0in", "bottom": "0in", "left": "0in"}
+            pdf_kwargs["width"]  = f"{content_width_in:.4f}in"
+            pdf_kwargs["height"] = f"{content_height_in:.4f}in"
+            pdf_kwargs.pop("format", None)
+    return pdf_kwargs
+
+# Ready = loaded, fonts settled and something painted. Replaces waiting for networkidle,
+# which trackers and long-polls can hold off until the navigation timeout.
+READY_PROBE_JS = """() => document.readyState === 'complete'
+    && (!document.fonts || document.fonts.status !== 'loading')
+    && performance.getEntriesByType('paint').some(p => p.name === 'first-contentful-paint')"""
+READY_PROBE_BUDGET_MS = 10000
+
+async def wait_until_ready(page, opts: CaptureOptions, logcb=print):
+    """
+    Bounded readiness probe after a "load" navigation. domcontentloaded and networkidle
+    are explicit user choices with their own waits, so they are not extended here.
+    """
+    if opts.wait_until != "load":
+        return
+    try:
+        await page.wait_for_function(READY_PROBE_JS, timeout=min(READY_PROBE_BUDGET_MS, opts.timeout_ms))
+    except PlaywrightTimeout:
+        logcb("[WAIT] Readiness probe timed out; continuing.")
+    except Exception:
+        pass
+
+JPEG_MAX_DIM_PX = 65535  # JPEG cannot encode larger; taller captures fall back to PNG
+
+async def full_page_screenshot(page, opts: CaptureOptions, logcb=print) -> bytes:
+    """
+    Full-page JPEG at opts.jpeg_quality, or PNG when the page is too tall for JPEG at opts.dpr
+    (checked up front, and as a retry if the JPEG capture fails). The PDF builders take either.
+    """
+    try:
+        height_css = await page.evaluate(
+            "() => Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0)")
+    except Exception:
+        height_css = 0
+    if height_css * opts.dpr < JPEG_MAX_DIM_PX - 1024:  # margin: layout can still grow while capturing
+        try:
+            return await page.screenshot(full_page=True, type="jpeg", quality=opts.jpeg_quality)
+        except Exception as e:
+            logcb(f"[CAPTURE][WARN] JPEG screenshot failed ({e}); retrying as PNG")
+    else:
+        logcb(f"[CAPTURE] Page is {height_css}px tall at DPR {opts.dpr}; too tall for JPEG, using PNG")
+    return await page.screenshot(full_page=True, type="png")
+
+NETWORKIDLE_BUDGET_MS = 5000
+
+async def navigate(page, url: str, opts: CaptureOptions):
+    """
+    page.goto() honouring opts.wait_until, except that networkidle is a bounded extra wait
+    after DOMContentLoaded: one long-poll or beacon must not hold the page for the full timeout.
+    """
+    if opts.wait_until != "networkidle":
+        await page.goto(url, wait_until=opts.wait_until, timeout=opts.timeout_ms)
+        return
+    await page.goto(url, wait_until="domcontentloaded", timeout=opts.timeout_ms)
+    try:
+        await page.wait_for_load_state("networkidle", timeout=min(NETWORKIDLE_BUDGET_MS, opts.timeout_ms))
+    except PlaywrightTimeout:
+        pass
+
+_BLOCKED_RE = re.compile(
+    r"^[a-z]+://(?:[^/?#]+\.)?(?:"
+    r"doubleclick\.net|googletagmanager\.com|google-analytics\.com|googlesyndication\.com|"
+    r"facebook\.net|hotjar\.com|segment\.io|segment\.com|scorecardresearch\.com|"
+    r"quantserve\.com|adnxs\.com|amplitude\.com"
+    r")(?:[:/?#]|$)"
+    r"|^[a-z]+://(?:www\.)?facebook\.com/tr(?:[/?#]|$)"
+    r"|/(?:pixel|beacon|1x1|spacer)\.gif(?:[?#]|$)",  # whole filename only: not track-record.gif
+    re.IGNORECASE,
+)
+_HEAVY_RESOURCE_TYPES = frozenset({"media", "font"})
+
+async def install_request_blocking(context, opts: CaptureOptions):
+    """
+    Route every subresource through a filter that aborts trackers (and optionally media/fonts).
+    Top-level navigations are never blocked, so those sites can still be captured themselves;
+    iframe navigations (ad frames) are filtered like any other request.
+    """
+    if not (opts.block_trackers or opts.block_media_fonts):
+        return
+
+    def is_main_frame_navigation(req) -> bool:
+        if not req.is_navigation_request():
+            return False
+        try:
+            return req.frame.parent_frame is None
+        except Exception:
+            return False  # frame unavailable: treat as a subframe
+
+    async def handle(route):
+        req = route.request
+        try:
+            if not is_main_frame_navigation(req) and (
+                (opts.block_trackers and _BLOCKED_RE.search(req.url))
+                or (opts.block_media_fonts and req.resource_type in _HEAVY_RESOURCE_TYPES)
+            ):
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception:
+            pass  # page/context closed while the request was in flight
+
+    await context.route("**/*", handle)
+
 async def capture_one(playwright, page, url: str, opts: CaptureOptions,
                       logcb=print,
-                      prompt_captcha_dialog=None) -> Path:
+                      prompt_captcha_dialog=None,
+                      aux_browser_ref: Optional[list] = None,
+                      captcha_lock: Optional[asyncio.Lock] = None,
+                      pending_writes: Optional[list] = None,
+                      out_path: Optional[Path] = None) -> Path:
     """
     Captures a single URL to PDF using provided headless page.
     If CAPTCHA is detected, opens a headful window and waits for user to click "Solved — Continue".
+    aux_browser_ref is a one-element list holding the shared headful browser (launched lazily on
+    the first CAPTCHA); the caller closes it. Without it, a private headful browser is used and closed here.
+    captcha_lock serializes CAPTCHA handoffs across concurrently running captures.
+    pending_writes, if given, receives the task writing a headless Print-mode PDF instead of the
+    write being awaited here, so the page can move on; the caller gathers them ([DONE] is logged on write).
+    out_path, if given, overrides the name derived from the URL (see batch_output_paths).
     Returns the output path.
     """
-    out_name = url_to_filename(url) if opts.filename_from_url else default_timestamped_name(url)
-    out_path = opts.output_dir / out_name
+    parsed = urlsplit(url)
+    host = host_of(parsed)
+    if out_path is None:
+        out_name = url_to_filename(parsed) if opts.filename_from_url else default_timestamped_name(url)
+        out_path = opts.output_dir / out_name
 
     logcb(f"[NAVIGATE] {url}")
-    # These are synchronous in async API — do NOT await
-    page.set_viewport_size({"width": opts.viewport_width, "height": 900})
-    page.set_default_timeout(opts.timeout_ms)
+    # Viewport, DPR and default timeout come from the context (see run_batch), not set per page.
 
     # First navigation (headless)
     try:
-        await page.goto(url, wait_until=opts.wait_until, timeout=opts.timeout_ms)
+        await navigate(page, url, opts)
     except PlaywrightTimeout:
         logcb("[WARN] Navigation timed out; proceeding with whatever rendered.")
+    await wait_until_ready(page, opts, logcb=logcb)
 
     # Detect CAPTCHA early
     det = await detect_captcha(page)
     if det.get("found"):
         logcb(f"[CAPTCHA] Detected ({det.get('provider')}): {', '.join(det.get('signals') or [])}")
 
-        # 1) Open a visible browser and load the URL
-        aux_browser = await playwright.chromium.launch(headless=False)  # visible
-        aux_ctx_kwargs = {
-            "viewport": {"width": opts.viewport_width, "height": 900},
-            "device_scale_factor": opts.dpr,
-        }
-        if opts.user_agent:
-            aux_ctx_kwargs["user_agent"] = opts.user_agent
-        aux_ctx = await aux_browser.new_context(**aux_ctx_kwargs)
+        # 1) Open a visible browser (launched once, reused across CAPTCHAs) and load the URL
+        # Held for the whole human handoff so concurrent workers never show two prompts at once.
+        if captcha_lock is None:
+            captcha_lock = asyncio.Lock()
+        async with captcha_lock:
+            owns_aux_browser = aux_browser_ref is None
+            if owns_aux_browser:
+                aux_browser_ref = [None]
+            if aux_browser_ref[0] is not None and not aux_browser_ref[0].is_connected():
+                aux_browser_ref[0] = None  # user quit the visible window; launch a new one
+            if aux_browser_ref[0] is None:
+                aux_browser_ref[0] = await playwright.chromium.launch(headless=False)  # visible
+            aux_ctx_kwargs = {
+                "viewport": {"width": opts.viewport_width, "height": 900},
+                "device_scale_factor": opts.dpr,
+            }
+            if opts.user_agent:
+                aux_ctx_kwargs["user_agent"] = opts.user_agent
+            if opts.global_js.strip():
+                aux_ctx_kwargs["bypass_csp"] = True  # see run_batch
+            aux_ctx = await aux_browser_ref[0].new_context(**aux_ctx_kwargs)
+            await aux_ctx.add_init_script(LAZY_PROBE_INIT_JS)
+            for script in opts.init_scripts:
+                await aux_ctx.add_init_script(script)
+
+            async def release_aux():
+                try:
+                    await aux_ctx.close()
+                    if owns_aux_browser:
+                        await aux_browser_ref[0].close()
+                except Exception:
+                    pass
 
-        # Import current cookies (sometimes helps)
-        try:
-            cookies = await page.context.cookies()
-            if cookies:
-                await aux_ctx.add_cookies(cookies)
-        except Exception:
-            pass
+            # Import current cookies (sometimes helps)
+            try:
+                cookies = await page.context.cookies()
+                if cookies:
+                    await aux_ctx.add_cookies(cookies)
+            except Exception:
+                pass
 
-        aux_page = await aux_ctx.new_page()
-        # Use domcontentloaded to avoid waiting on challenge network idleness
-        try:
-            await aux_page.goto(url, wait_until="domcontentloaded", timeout=opts.timeout_ms)
-        except Exception:
-            pass
+            aux_page = await aux_ctx.new_page()
+            # Use domcontentloaded to avoid waiting on challenge network idleness
+            try:
+                await aux_page.goto(url, wait_until="domcontentloaded", timeout=opts.timeout_ms)
+            except Exception:
+                pass
 
-        # 2) Ask human to solve, via GUI dialog
-        decision = {"action": None}
-        event = threading.Event()
-        if prompt_captcha_dialog:
-            prompt_captcha_dialog(url, event, decision)
-        logcb("[CAPTCHA] Visible Chromium window opened. Solve challenge, then click 'Solved — Continue'.")
+            # 2) Ask human to solve, via GUI dialog
+            decision = {"action": None}
+            event = threading.Event()
+            if prompt_captcha_dialog:
+                prompt_captcha_dialog(url, event, decision)
+            logcb("[CAPTCHA] Visible Chromium window opened. Solve challenge, then click 'Solved — Continue'.")
 
-        # Wait until the user indicates it's solved or wants to skip
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, event.wait)
+            # Wait until the user indicates it's solved or wants to skip
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(_BLOCKING_EXEC, event.wait)
 
         if decision.get("action") != "continue":
             logcb("[CAPTCHA] Skipped by user.")
-            try:
-                await aux_ctx.close(); await aux_browser.close()
-            except Exception:
-                pass
+            await release_aux()
             # Proceed with headless anyway (will likely capture gate)
         else:
             # 3) Copy cookies and try headless again (for Print mode)
@@ -530,184 +935,211 @@ async def capture_one(playwright, page, url: str, opts: CaptureOptions,
             # If Print mode, try headless print first; else we will screenshot from the solved aux_page.
             if opts.mode == "print":
                 try:
-                    await page.goto(url, wait_until=opts.wait_until, timeout=opts.timeout_ms)
+                    await navigate(page, url, opts)
+                    await wait_until_ready(page, opts, logcb=logcb)
                     det2 = await detect_captcha(page)
                 except Exception:
                     det2 = {"found": True}
                 if not det2.get("found"):
                     # Good — continue in headless (print)
                     try:
-                        await prepare_page_for_capture(page, opts, logcb=logcb)
+                        prep = await prepare_page_for_capture(page, opts, logcb=logcb, host=host)
                         await page.emulate_media(media="screen")
-                        pdf_kwargs = {
-                            "path": str(out_path),
-                            "print_background": True,
-                            "margin": {"top": "0.5in", "right": "0.5in", "bottom": "0.5in", "left": "0.5in"},
-                            "prefer_css_page_size": False,
-                            "scale": 1.0,
-                            "display_header_footer": False,
-                        }
-                        if opts.exact_single_page:
-                            content_height_px = await page.evaluate(
-                                """() => Math.max(
-                                     document.documentElement.scrollHeight,
-                                     document.body ? document.body.scrollHeight : 0,
-                                     document.documentElement.getBoundingClientRect().height
-                                 )"""
-                            )
-                            content_height_in = float(content_height_px) / CSS_PX_PER_INCH
-                            content_width_in = float(opts.viewport_width) / CSS_PX_PER_INCH
-                            if content_height_in <= 199.0:
-                                pdf_kwargs["margin"] = {"top": "0in", "right": "0in", "bottom": "0in", "left": "0in"}
-                                pdf_kwargs["width"]  = f"{content_width_in:.4f}in"
-                                pdf_kwargs["height"] = f"{content_height_in:.4f}in"
-                                pdf_kwargs.pop("format", None)
-                            else:
-                                pdf_kwargs["format"] = "Letter"
-                                pdf_kwargs.pop("width", None)
-                                pdf_kwargs.pop("height", None)
-                        else:
-                            pdf_kwargs["format"] = "Letter"
-                            pdf_kwargs.pop("width", None)
-                            pdf_kwargs.pop("height", None)
-                        await page.pdf(**pdf_kwargs)
+                        pdf_kwargs = build_print_pdf_kwargs(opts, prep.get("contentHeight", 0))
+                        pdf_bytes = await page.pdf(**pdf_kwargs)
+                        await asyncio.to_thread(write_pdf_bytes, out_path, pdf_bytes)
                         logcb(f"[DONE] Saved → {out_path}")
-                        try:
-                            await aux_ctx.close(); await aux_browser.close()
-                        except Exception:
-                            pass
+                        await release_aux()
                         return out_path
                     except Exception as e:
                         logcb(f"[PRINT][WARN] page.pdf failed ({e}); will screenshot from solved window.")
 
             # 4) Screenshot from the solved visible page (works for Screenshot mode or Print fallback)
             try:
-                await prepare_page_for_capture(aux_page, opts, logcb=logcb)
-                png_bytes = await aux_page.screenshot(full_page=True, type="png")
+                await prepare_page_for_capture(aux_page, opts, logcb=logcb, host=host)
+                image_bytes = await full_page_screenshot(aux_page, opts, logcb=logcb)
                 if opts.exact_single_page:
-                    screenshot_to_singlepage_pdf(png_bytes, out_path)
+                    await asyncio.to_thread(screenshot_to_singlepage_pdf, image_bytes, out_path)
                 else:
-                    screenshot_to_paginated_letter_pdf(png_bytes, out_path)
+                    await asyncio.to_thread(screenshot_to_paginated_letter_pdf, image_bytes, out_path)
                 logcb(f"[DONE] Saved → {out_path}")
-                try:
-                    await aux_ctx.close(); await aux_browser.close()
-                except Exception:
-                    pass
+                await release_aux()
                 return out_path
             except Exception as e:
                 logcb(f"[CAPTCHA][FALLBACK ERROR] {e}")
-                try:
-                    await aux_ctx.close(); await aux_browser.close()
-                except Exception:
-                    pass
+                await release_aux()
                 # fall through to headless capture (likely gate)
 
     # Normal headless path
-    # Apply per-site overrides before capture
-    # (site_rules are matched later in prepare_page_for_capture via injected global CSS/JS)
-    # Do the main capture (screenshot or print)
-    # Per-site CSS/JS injection happens in prepare_page_for_capture
-    # But we still apply site-specific blocks here:
-    # (We parse+inject below so they also affect print pipeline.)
-    # NOTE: prepare_page_for_capture also injects global css/js and unstick etc.
-    # Do site-specific now:
-    # (kept as in previous versions)
-    #  -- Site-specific CSS/JS --
-    # We'll inject them inside prepare_page_for_capture by adding to global fields, so:
-    pass  # placeholder to keep structure clear
-
-    # Site-specific (explicit) injection: we do it here, before prepare_page_for_capture
-    from urllib.parse import urlparse
-    h = (urlparse(url).netloc or "").lower()
-    # We’ll do matching and inject here so they participate in both screenshot and print:
-    # (If you prefer to inject only for screenshot, you could move to prepare_page_for_capture.)
-    # (Kept minimal to avoid double-injection.)
-    # -- nothing to inject here; prepare_page_for_capture handles global CSS/JS.
-
     # Prepare & capture on the headless page
-    await prepare_page_for_capture(page, opts, logcb=logcb)
+    prep = await prepare_page_for_capture(page, opts, logcb=logcb, host=host)
 
     if opts.mode == "screenshot":
         logcb("[CAPTURE] Screenshot full-page raster")
-        png_bytes = await page.screenshot(full_page=True, type="png")
+        image_bytes = await full_page_screenshot(page, opts, logcb=logcb)
         if opts.exact_single_page:
-            screenshot_to_singlepage_pdf(png_bytes, out_path)
+            await asyncio.to_thread(screenshot_to_singlepage_pdf, image_bytes, out_path)
         else:
-            screenshot_to_paginated_letter_pdf(png_bytes, out_path)
+            await asyncio.to_thread(screenshot_to_paginated_letter_pdf, image_bytes, out_path)
     else:
         logcb("[CAPTURE] Print mode via Chromium PDF engine")
         await page.emulate_media(media="screen")
-        pdf_kwargs = {
-            "path": str(out_path),
-            "print_background": True,
-            "margin": {"top": "0.5in", "right": "0.5in", "bottom": "0.5in", "left": "0.5in"},
-            "prefer_css_page_size": False,
-            "scale": 1.0,
-            "display_header_footer": False,
-        }
-        if opts.exact_single_page:
-            content_height_px = await page.evaluate(
-                """() => Math.max(
-                    document.documentElement.scrollHeight,
-                    document.body ? document.body.scrollHeight : 0,
-                    document.documentElement.getBoundingClientRect().height
-                )"""
-            )
-            content_height_in = float(content_height_px) / CSS_PX_PER_INCH
-            content_width_in = float(opts.viewport_width) / CSS_PX_PER_INCH
-            if content_height_in <= 199.0:
-                pdf_kwargs["margin"] = {"top": "0in", "right": "0in", "bottom": "0in", "left": "0in"}
-                pdf_kwargs["width"]  = f"{content_width_in:.4f}in"
-                pdf_kwargs["height"] = f"{content_height_in:.4f}in"
-                pdf_kwargs.pop("format", None)
-            else:
-                pdf_kwargs["format"] = "Letter"
-                pdf_kwargs.pop("width", None)
-                pdf_kwargs.pop("height", None)
-        else:
-            pdf_kwargs["format"] = "Letter"
-            pdf_kwargs.pop("width", None)
-            pdf_kwargs.pop("height", None)
+        pdf_kwargs = build_print_pdf_kwargs(opts, prep.get("contentHeight", 0))
         try:
-            await page.pdf(**pdf_kwargs)
+            pdf_bytes = await page.pdf(**pdf_kwargs)
+            if pending_writes is not None:
+                async def write_in_background():
+                    try:
+                        await asyncio.to_thread(write_pdf_bytes, out_path, pdf_bytes)
+                        logcb(f"[DONE] Saved → {out_path}")
+                    except Exception as e:
+                        logcb(f"[ERROR] {url}: writing {out_path} failed: {e}")
+                pending_writes.append(asyncio.create_task(write_in_background()))
+                return out_path
+            await asyncio.to_thread(write_pdf_bytes, out_path, pdf_bytes)
         except Exception as e:
             logcb(f"[PRINT][WARN] page.pdf failed ({e}); falling back to screenshot→PDF")
-            png_bytes = await page.screenshot(full_page=True, type="png")
+            image_bytes = await full_page_screenshot(page, opts, logcb=logcb)
             if opts.exact_single_page:
-                screenshot_to_singlepage_pdf(png_bytes, out_path)
+                await asyncio.to_thread(screenshot_to_singlepage_pdf, image_bytes, out_path)
             else:
-                screenshot_to_paginated_letter_pdf(png_bytes, out_path)
+                await asyncio.to_thread(screenshot_to_paginated_letter_pdf, image_bytes, out_path)
 
     logcb(f"[DONE] Saved → {out_path}")
     return out_path
 
-async def run_batch(urls, opts: CaptureOptions, logcb=print, prompt_captcha_dialog=None):
-    launch_args = {"headless": True, "args": []}
+def chromium_launch_args(opts: CaptureOptions) -> Dict[str, Any]:
+    launch_args = {"headless": True, "args": list(opts.chromium_args)}
     if opts.no_sandbox:
         launch_args["args"].extend(["--no-sandbox", "--disable-setuid-sandbox"])
+    return launch_args
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(**launch_args)
-        context_kwargs = {
-            "viewport": {"width": opts.viewport_width, "height": 900},
-            "device_scale_factor": opts.dpr,
-        }
-        if opts.user_agent:
-            context_kwargs["user_agent"] = opts.user_agent
-        context = await browser.new_context(**context_kwargs)
-        page = await context.new_page()
+def host_affinity_chunks(urls: List[str], chunk_size: int) -> List[List[Tuple[int, str]]]:
+    """
+    Group (1-based index, url) pairs by host (first-seen order), split into runs of at most chunk_size.
+    A worker takes a whole run, so same-host URLs reuse one context's open connections (the HTTP
+    cache is off whenever install_request_blocking routes the context), while a dominant host is
+    still spread over several workers.
+    """
+    groups: Dict[str, List[Tuple[int, str]]] = {}
+    for item in enumerate(urls, 1):
+        groups.setdefault(host_of(item[1]), []).append(item)
+    chunk_size = max(1, chunk_size)
+    return [group[k:k + chunk_size] for group in groups.values() for k in range(0, len(group), chunk_size)]
 
+def batch_output_paths(urls: List[str], opts: CaptureOptions) -> List[Path]:
+    """
+    One output path per URL, made unique within the batch: URLs differing only in query or
+    fragment (or repeated) get _2, _3, ... so concurrent workers never write the same file.
+    """
+    seen = set()
+    paths = []
+    for url in urls:
+        name = url_to_filename(url) if opts.filename_from_url else default_timestamped_name(url)
+        stem, ext = os.path.splitext(name)
+        candidate, n = name, 2
+        while candidate.lower() in seen:  # case-insensitive, for Windows/macOS filesystems
+            candidate = f"{stem}_{n}{ext}"
+            n += 1
+        seen.add(candidate.lower())
+        paths.append(opts.output_dir / candidate)
+    return paths
+
+async def run_batch(p, urls, opts: CaptureOptions, logcb=print, prompt_captcha_dialog=None, browser=None,
+                    progresscb=None, stop_event: Optional[threading.Event] = None):
+    """
+    Capture urls using an already-started Playwright p (see async_playwright().start()).
+    If browser is given it is reused and left open; otherwise a headless Chromium is launched and closed here.
+    progresscb, if given, is called once per URL as it finishes (saved, skipped or failed).
+    stop_event, if given, is checked before each URL; once set, workers finish their current URL and exit.
+    """
+    opts.output_dir.mkdir(parents=True, exist_ok=True)
+    owns_browser = browser is None
+    if owns_browser:
+        browser = await p.chromium.launch(**chromium_launch_args(opts))
+    aux_browser_ref = [None]  # headful browser for CAPTCHA handoff, launched on first use
+    init_scripts = opts.init_scripts
+    if init_scripts:
+        logcb("[INJECT] Global CSS/JS registered as context init scripts")
+    captcha_lock = asyncio.Lock()
+    pending_writes = []  # Print-mode PDF writes still running while the next URL navigates
+    context_kwargs = {
+        "viewport": {"width": opts.viewport_width, "height": 900},
+        "device_scale_factor": opts.dpr,
+    }
+    if opts.user_agent:
+        context_kwargs["user_agent"] = opts.user_agent
+    if opts.global_js.strip():
+        context_kwargs["bypass_csp"] = True  # Global JS is compiled in-page; a strict CSP would forbid that
+
+    # A fixed pool of long-lived contexts (init scripts and routing set up once each);
+    # a free context takes the next same-host run of URLs and opens a fresh page per URL.
+    n_workers = max(1, min(len(urls), opts.concurrency))
+    out_paths = batch_output_paths(urls, opts)
+    work_queue: asyncio.Queue = asyncio.Queue()
+    for chunk in host_affinity_chunks(urls, math.ceil(len(urls) / n_workers)):
+        work_queue.put_nowait(chunk)
+
+    async def worker():
+        context = await browser.new_context(**context_kwargs)
+        context.set_default_timeout(opts.timeout_ms)  # synchronous in the async API — do NOT await
         try:
-            for i, url in enumerate(urls, 1):
-                logcb(f"=== [{i}/{len(urls)}] {url}")
+            await context.add_init_script(LAZY_PROBE_INIT_JS)
+            if init_scripts:
+                await context.expose_function(
+                    INIT_ERROR_BINDING,
+                    lambda url, err: logcb(f"[INJECT][WARN] Global JS failed on {url}: {err}"))
+            for script in init_scripts:
+                await context.add_init_script(script)
+            await install_request_blocking(context, opts)
+            while True:
                 try:
-                    await capture_one(p, page, url, opts, logcb=logcb,
-                                      prompt_captcha_dialog=prompt_captcha_dialog)
-                except Exception as e:
-                    logcb(f"[ERROR] {url}: {e}")
+                    chunk = work_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                for i, url in chunk:
+                    if stop_event is not None and stop_event.is_set():
+                        return
+                    logcb(f"=== [{i}/{len(urls)}] {url}")
+                    page = None
+                    try:
+                        page = await context.new_page()
+                        await capture_one(p, page, url, opts, logcb=logcb,
+                                          prompt_captcha_dialog=prompt_captcha_dialog,
+                                          aux_browser_ref=aux_browser_ref,
+                                          captcha_lock=captcha_lock,
+                                          pending_writes=pending_writes,
+                                          out_path=out_paths[i - 1])
+                    except Exception as e:
+                        logcb(f"[ERROR] {url}: {e}")
+                    finally:
+                        if page is not None:
+                            try:
+                                await page.close()
+                            except Exception:
+                                pass
+                        if progresscb:
+                            progresscb()
         finally:
-            await context.close()
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    try:
+        results = await asyncio.gather(*(worker() for _ in range(n_workers)), return_exceptions=True)
+        for res in results:
+            if isinstance(res, Exception):
+                logcb(f"[ERROR] Capture worker failed: {res}")
+        await asyncio.gather(*pending_writes)
+    finally:
+        if owns_browser:
             await browser.close()
+        if aux_browser_ref[0] is not None:
+            try:
+                await aux_browser_ref[0].close()
+            except Exception:
+                pass
 
 # ---------- GUI App ----------
 
@@ -717,6 +1149,7 @@ class App(tk.Tk):
         self.title("Web Page → PDF Capture")
         self.geometry("1060x860")
         self.minsize(980, 800)
+        self._cwd = Path.cwd()  # default output folder, read once
 
         self.urls_text = None
         self.log_text = None
@@ -728,24 +1161,49 @@ class App(tk.Tk):
         self.viewport_var = tk.StringVar(value="1366")
         self.dpr_var = tk.StringVar(value="2")
         self.delay_var = tk.StringVar(value="0")
-        self.waituntil_var = tk.StringVar(value="networkidle")
+        self.waituntil_var = tk.StringVar(value="load")
         self.ua_var = tk.StringVar(value="")
         self.timeout_var = tk.StringVar(value="45000")
         self.no_sandbox_var = tk.BooleanVar(value=False)
         self.filename_from_url_var = tk.BooleanVar(value=True)
-        self.output_dir_var = tk.StringVar(value=str(Path.cwd()))
+        self.output_dir_var = tk.StringVar(value=str(self._cwd))
         self.hide_cookie_var = tk.BooleanVar(value=True)
         self.unstick_var = tk.BooleanVar(value=True)
+        self.block_trackers_var = tk.BooleanVar(value=True)
+        self.fast_mode_var = tk.BooleanVar(value=False)  # Print mode only: skip media and web fonts
+        self.concurrency_var = tk.StringVar(value="4")
 
         # Custom CSS/JS
         self.global_css_text = None
         self.global_js_text = None
         self.site_rules_text = None
+        self._rules_cache: Optional[Tuple[List[SiteRule], SiteRuleIndex]] = None  # parsed + indexed Per-site rules, reused until the text changes
+        self._rules_dirty = True
 
+        self._toggleable = []  # input widgets disabled while a batch runs (see _toggle)
         self._build_ui()
 
-        self.worker_thread = None
+        # log() only enqueues (safe from any thread); _drain_log flushes to the widget every 100 ms
+        self._log_q = queue.SimpleQueue()
+        self.after(100, self._drain_log)
+
         self.stop_flag = threading.Event()
+        self._batch_future = None
+        self._captcha_pending: Dict[threading.Event, dict] = {}  # open CAPTCHA prompts: event -> decision
+        self._closing = False  # set by on_close; later prompts resolve to "skip" at once
+
+        # One asyncio loop, Playwright driver and headless browser for the whole session,
+        # so only the first batch pays the driver spawn and Chromium launch.
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="w2pdf-loop", daemon=True).start()
+        self._pw = None
+        self._browser = None
+        self._browser_launch_args = None
+        self._browser_lock = None  # see _get_browser_lock; created on self._loop, not on the Tk thread
+        # Start the driver and Chromium while the user is still pasting URLs; Start reuses them.
+        asyncio.run_coroutine_threadsafe(
+            self._prewarm(CaptureOptions(no_sandbox=self.no_sandbox_var.get())), self._loop)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     # ----- CAPTCHA dialog (called from worker) -----
     def prompt_captcha_dialog(self, url: str, event: threading.Event, decision: dict):
@@ -753,6 +1211,15 @@ class App(tk.Tk):
         Create a small modal-ish dialog telling the user to solve the CAPTCHA and
         click 'Solved — Continue'. Sets decision["action"] and event.set() on button click.
         """
+        # Register before checking _closing: on_close sets _closing before releasing the
+        # registered prompts, so either it sees this one or this check sees the flag.
+        self._captcha_pending[event] = decision
+        if self._closing:
+            self._captcha_pending.pop(event, None)
+            decision["action"] = "skip"
+            event.set()
+            return
+
         def _build():
             top = tk.Toplevel(self)
             top.title("CAPTCHA detected")
@@ -767,6 +1234,7 @@ class App(tk.Tk):
             btns = ttk.Frame(frm); btns.pack(fill=tk.X, pady=(12,0))
             def _finish(act):
                 decision["action"] = act
+                self._captcha_pending.pop(event, None)
                 event.set()
                 try:
                     top.destroy()
@@ -789,7 +1257,7 @@ class App(tk.Tk):
         top_frame.pack(fill=tk.BOTH, expand=True)
 
         ttk.Label(top_frame, text="URLs (one per line):").grid(row=0, column=0, sticky="w")
-        self.urls_text = tk.Text(top_frame, height=10, wrap="none")
+        self.urls_text = self._toggle(tk.Text(top_frame, height=10, wrap="none"))
         self.urls_text.grid(row=1, column=0, columnspan=6, sticky="nsew", pady=(4, 8))
         top_frame.rowconfigure(1, weight=1)
         top_frame.columnconfigure(5, weight=1)
@@ -799,50 +1267,54 @@ class App(tk.Tk):
         opts.grid(row=2, column=0, columnspan=6, sticky="ew")
 
         ttk.Label(opts, text="Mode:").grid(row=0, column=0, sticky="w")
-        ttk.Radiobutton(opts, text="Screenshot (WYSIWYG raster)", variable=self.mode_var, value="screenshot").grid(row=0, column=1, sticky="w")
-        ttk.Radiobutton(opts, text="Print (text selectable)", variable=self.mode_var, value="print").grid(row=0, column=2, sticky="w")
+        self._toggle(ttk.Radiobutton(opts, text="Screenshot (WYSIWYG raster)", variable=self.mode_var, value="screenshot")).grid(row=0, column=1, sticky="w")
+        self._toggle(ttk.Radiobutton(opts, text="Print (text selectable)", variable=self.mode_var, value="print")).grid(row=0, column=2, sticky="w")
 
         ttk.Label(opts, text="Page size:").grid(row=1, column=0, sticky="w", pady=(6,0))
-        ttk.Radiobutton(opts, text="Exact single page", variable=self.page_style_var, value="single").grid(row=1, column=1, sticky="w", pady=(6,0))
-        ttk.Radiobutton(opts, text="Paginated Letter (8.5×11, normal margins)", variable=self.page_style_var, value="letter").grid(row=1, column=2, sticky="w", pady=(6,0))
+        self._toggle(ttk.Radiobutton(opts, text="Exact single page", variable=self.page_style_var, value="single")).grid(row=1, column=1, sticky="w", pady=(6,0))
+        self._toggle(ttk.Radiobutton(opts, text="Paginated Letter (8.5×11, normal margins)", variable=self.page_style_var, value="letter")).grid(row=1, column=2, sticky="w", pady=(6,0))
 
         ttk.Label(opts, text="Viewport width:").grid(row=2, column=0, sticky="w", pady=(6,0))
-        ttk.Entry(opts, textvariable=self.viewport_var, width=10).grid(row=2, column=1, sticky="w", pady=(6,0))
+        self._toggle(ttk.Entry(opts, textvariable=self.viewport_var, width=10)).grid(row=2, column=1, sticky="w", pady=(6,0))
         ttk.Label(opts, text="DPR:").grid(row=2, column=2, sticky="e", pady=(6,0))
-        ttk.Entry(opts, textvariable=self.dpr_var, width=6).grid(row=2, column=3, sticky="w", pady=(6,0))
+        self._toggle(ttk.Entry(opts, textvariable=self.dpr_var, width=6)).grid(row=2, column=3, sticky="w", pady=(6,0))
         ttk.Label(opts, text="Extra delay (ms):").grid(row=2, column=4, sticky="e", pady=(6,0))
-        ttk.Entry(opts, textvariable=self.delay_var, width=8).grid(row=2, column=5, sticky="w", pady=(6,0))
+        self._toggle(ttk.Entry(opts, textvariable=self.delay_var, width=8)).grid(row=2, column=5, sticky="w", pady=(6,0))
 
         ttk.Label(opts, text="Wait-until:").grid(row=3, column=0, sticky="w", pady=(6,0))
-        wait_combo = ttk.Combobox(opts, textvariable=self.waituntil_var, values=["load","domcontentloaded","networkidle"], state="readonly", width=18)
+        wait_combo = self._toggle(ttk.Combobox(opts, textvariable=self.waituntil_var, values=["load","domcontentloaded","networkidle"], state="readonly", width=18))
         wait_combo.grid(row=3, column=1, sticky="w", pady=(6,0))
 
         ttk.Label(opts, text="User-Agent (optional):").grid(row=3, column=2, sticky="e", pady=(6,0))
-        ttk.Entry(opts, textvariable=self.ua_var, width=40).grid(row=3, column=3, columnspan=3, sticky="w", pady=(6,0))
+        self._toggle(ttk.Entry(opts, textvariable=self.ua_var, width=40)).grid(row=3, column=3, columnspan=3, sticky="w", pady=(6,0))
 
         ttk.Label(opts, text="Timeout (ms):").grid(row=4, column=0, sticky="w", pady=(6,0))
-        ttk.Entry(opts, textvariable=self.timeout_var, width=10).grid(row=4, column=1, sticky="w", pady=(6,0))
+        self._toggle(ttk.Entry(opts, textvariable=self.timeout_var, width=10)).grid(row=4, column=1, sticky="w", pady=(6,0))
 
-        ttk.Checkbutton(opts, text="Chromium --no-sandbox", variable=self.no_sandbox_var).grid(row=4, column=2, columnspan=2, sticky="w", pady=(6,0))
-        ttk.Checkbutton(opts, text="Hide cookie/consent banners", variable=self.hide_cookie_var).grid(row=4, column=4, sticky="w", pady=(6,0))
-        ttk.Checkbutton(opts, text="Remove sticky headers/footers", variable=self.unstick_var).grid(row=4, column=5, sticky="w", pady=(6,0))
+        self._toggle(ttk.Checkbutton(opts, text="Chromium --no-sandbox", variable=self.no_sandbox_var)).grid(row=4, column=2, columnspan=2, sticky="w", pady=(6,0))
+        self._toggle(ttk.Checkbutton(opts, text="Hide cookie/consent banners", variable=self.hide_cookie_var)).grid(row=4, column=4, sticky="w", pady=(6,0))
+        self._toggle(ttk.Checkbutton(opts, text="Remove sticky headers/footers", variable=self.unstick_var)).grid(row=4, column=5, sticky="w", pady=(6,0))
+        ttk.Label(opts, text="Concurrency:").grid(row=5, column=0, sticky="w", pady=(6,0))
+        self._toggle(ttk.Spinbox(opts, from_=1, to=16, textvariable=self.concurrency_var, width=6)).grid(row=5, column=1, sticky="w", pady=(6,0))
+        self._toggle(ttk.Checkbutton(opts, text="Block ads/trackers", variable=self.block_trackers_var)).grid(row=5, column=4, sticky="w", pady=(6,0))
+        self._toggle(ttk.Checkbutton(opts, text="Fast print (skip media/fonts)", variable=self.fast_mode_var)).grid(row=5, column=5, sticky="w", pady=(6,0))
 
         # Output
         out_frame = ttk.LabelFrame(top_frame, text="Output", padding=8)
         out_frame.grid(row=3, column=0, columnspan=6, sticky="ew", pady=(8,0))
 
-        ttk.Checkbutton(out_frame, text="Filename same as URL (example_com_directory_filename_htm.pdf)", variable=self.filename_from_url_var).grid(row=0, column=0, columnspan=4, sticky="w")
+        self._toggle(ttk.Checkbutton(out_frame, text="Filename same as URL (example_com_directory_filename_htm.pdf)", variable=self.filename_from_url_var)).grid(row=0, column=0, columnspan=4, sticky="w")
 
         ttk.Label(out_frame, text="Output folder:").grid(row=1, column=0, sticky="w", pady=(6,0))
-        out_entry = ttk.Entry(out_frame, textvariable=self.output_dir_var, width=70)
+        out_entry = self._toggle(ttk.Entry(out_frame, textvariable=self.output_dir_var, width=70))
         out_entry.grid(row=1, column=1, sticky="ew", pady=(6,0))
         out_frame.columnconfigure(1, weight=1)
-        ttk.Button(out_frame, text="Browse…", command=self.browse_output_dir).grid(row=1, column=2, sticky="w", padx=(6,0), pady=(6,0))
+        self._toggle(ttk.Button(out_frame, text="Browse…", command=self.browse_output_dir)).grid(row=1, column=2, sticky="w", padx=(6,0), pady=(6,0))
 
         # Start/Stop + Progress
         btn_frame = ttk.Frame(top_frame)
         btn_frame.grid(row=4, column=0, columnspan=6, sticky="ew", pady=(8,0))
-        ttk.Button(btn_frame, text="Start", command=self.on_start).pack(side=tk.LEFT, padx=(0,8))
+        self._toggle(ttk.Button(btn_frame, text="Start", command=self.on_start)).pack(side=tk.LEFT, padx=(0,8))
         ttk.Button(btn_frame, text="Stop", command=self.on_stop).pack(side=tk.LEFT)
         self.progress = ttk.Progressbar(btn_frame, orient=tk.HORIZONTAL, mode="determinate")
         self.progress.pack(fill=tk.X, expand=True, padx=(12,0))
@@ -862,11 +1334,11 @@ class App(tk.Tk):
         gtop.pack(fill=tk.BOTH, expand=True)
 
         ttk.Label(gtop, text="Global CSS (applied to every page before capture):").pack(anchor="w")
-        self.global_css_text = tk.Text(gtop, height=10, wrap="word")
+        self.global_css_text = self._toggle(tk.Text(gtop, height=10, wrap="word"))
         self.global_css_text.pack(fill=tk.BOTH, expand=True, pady=(4,8))
 
-        ttk.Label(gtop, text="Global JS (executed on every page before capture):").pack(anchor="w")
-        self.global_js_text = tk.Text(gtop, height=10, wrap="word")
+        ttk.Label(gtop, text="Global JS (executed on every page at window load, before scrolling and cleanup):").pack(anchor="w")
+        self.global_js_text = self._toggle(tk.Text(gtop, height=10, wrap="word"))
         self.global_js_text.pack(fill=tk.BOTH, expand=True, pady=(4,8))
 
         # ---- Tab 3: Per-site CSS/JS ----
@@ -885,11 +1357,23 @@ class App(tk.Tk):
                     "@end\n\n"
                     "Domain match is suffix-based (so 'coingecko.com' matches 'www.coingecko.com').")
         ttk.Label(stop, text=help_lbl, justify="left").pack(anchor="w")
-        self.site_rules_text = tk.Text(stop, height=24, wrap="word")
+        self.site_rules_text = self._toggle(tk.Text(stop, height=24, wrap="word"))
         self.site_rules_text.pack(fill=tk.BOTH, expand=True, pady=(6,0))
+        self.site_rules_text.bind("<<Modified>>", self._on_rules_modified)
+
+    def _on_rules_modified(self, _event=None):
+        self._rules_dirty = True
+        self.site_rules_text.edit_modified(False)  # re-arm: Tk only fires <<Modified>> when the flag flips
+
+    def _site_rules(self) -> Tuple[List[SiteRule], SiteRuleIndex]:
+        if self._rules_dirty or self._rules_cache is None:
+            rules = parse_site_rules(self.site_rules_text.get("1.0", "end"))
+            self._rules_cache = (rules, SiteRuleIndex.build(rules))
+            self._rules_dirty = False
+        return self._rules_cache
 
     def browse_output_dir(self):
-        d = filedialog.askdirectory(initialdir=self.output_dir_var.get() or str(Path.cwd()))
+        d = filedialog.askdirectory(initialdir=self.output_dir_var.get() or str(self._cwd))
         if d:
             self.output_dir_var.set(d)
 
@@ -899,12 +1383,13 @@ class App(tk.Tk):
             dpr = float(self.dpr_var.get().strip())
             delay = int(self.delay_var.get().strip())
             timeout_ms = int(self.timeout_var.get().strip())
+            concurrency = max(1, int(self.concurrency_var.get().strip()))
         except Exception:
-            messagebox.showerror("Invalid option", "Viewport width, DPR, delay, and timeout must be numeric.")
+            messagebox.showerror("Invalid option", "Viewport width, DPR, delay, timeout, and concurrency must be numeric.")
             return None
 
         exact_single = (self.page_style_var.get() == "single")
-        site_rules = parse_site_rules(self.site_rules_text.get("1.0", "end"))
+        site_rules, site_index = self._site_rules()
 
         opts = CaptureOptions(
             mode=self.mode_var.get(),
@@ -917,18 +1402,29 @@ class App(tk.Tk):
             timeout_ms=timeout_ms,
             no_sandbox=self.no_sandbox_var.get(),
             filename_from_url=self.filename_from_url_var.get(),
-            output_dir=Path(self.output_dir_var.get().strip() or Path.cwd()),
+            output_dir=Path(self.output_dir_var.get().strip() or self._cwd),
             hide_cookie_banners=self.hide_cookie_var.get(),
             unstick_bars=self.unstick_var.get(),
+            block_trackers=self.block_trackers_var.get(),
+            block_media_fonts=(self.fast_mode_var.get() and self.mode_var.get() == "print"),
+            concurrency=concurrency,
             global_css=self.global_css_text.get("1.0", "end").strip(),
             global_js=self.global_js_text.get("1.0", "end").strip(),
             site_rules=site_rules,
+            site_index=site_index,
         )
         return opts
 
     def _collect_urls(self):
-        raw = self.urls_text.get("1.0", "end").strip()
-        urls = [u.strip() for u in raw.splitlines() if u.strip()]
+        raw = self.urls_text.get("1.0", "end")
+        urls = []
+        for s in (ln.strip() for ln in raw.splitlines()):
+            if not s:
+                continue
+            if _URL_RE.match(s):
+                urls.append(s)
+            else:
+                self.log(f"[SKIP] Not an http(s) URL: {s}")
         return urls
 
     def on_start(self):
@@ -954,59 +1450,113 @@ class App(tk.Tk):
         self.stop_flag.clear()
         self._set_controls_enabled(False)
 
-        self.worker_thread = threading.Thread(target=self._worker_run, args=(urls, opts), daemon=True)
-        self.worker_thread.start()
+        self._batch_future = asyncio.run_coroutine_threadsafe(self._batch_main(urls, opts), self._loop)
 
     def on_stop(self):
-        if self.worker_thread and self.worker_thread.is_alive():
+        if self._batch_future and not self._batch_future.done():
             self.log("[USER] Stop requested; will cancel after current URL.")
             self.stop_flag.set()
 
+    def _toggle(self, widget):
+        """Register an input widget for _set_controls_enabled; returns it for chaining."""
+        self._toggleable.append(widget)
+        return widget
+
     def _set_controls_enabled(self, enabled: bool):
-        state = "normal" if enabled else "disabled"
-        for child in self.winfo_children():
-            self._set_state_recursive(child, state)
-        self.log_text.config(state="disabled")
+        for w in self._toggleable:
+            if isinstance(w, ttk.Combobox):
+                w.configure(state="readonly" if enabled else "disabled")
+            else:
+                w.configure(state="normal" if enabled else "disabled")
+
+    async def _ensure_browser(self, opts: CaptureOptions):
+        """
+        Start the Playwright driver once, and (re)launch headless Chromium only when
+        the launch arguments changed or the previous browser went away.
+        """
+        async with self._get_browser_lock():
+            if self._pw is None:
+                self._pw = await async_playwright().start()
+            launch_args = chromium_launch_args(opts)
+            if self._browser is not None and (launch_args != self._browser_launch_args
+                                              or not self._browser.is_connected()):
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._browser is None:
+                self._browser = await self._pw.chromium.launch(**launch_args)
+                self._browser_launch_args = launch_args
+            return self._browser
+
+    def _get_browser_lock(self) -> asyncio.Lock:
+        """
+        Lock serializing _ensure_browser/_shutdown_playwright. Only called from coroutines on
+        self._loop, so the Lock binds to that loop (Python 3.9 binds it at construction).
+        """
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        return self._browser_lock
 
-    def _set_state_recursive(self, widget, state):
+    async def _prewarm(self, opts: CaptureOptions):
         try:
-            if widget is self.log_text:
-                return
-            if isinstance(widget, (ttk.Entry, ttk.Combobox, ttk.Button, ttk.Radiobutton, ttk.Checkbutton, ttk.Frame, ttk.LabelFrame, ttk.Label, tk.Text, ttk.Progressbar)):
-                if isinstance(widget, ttk.Combobox):
-                    widget.configure(state=state if state in ("normal", "readonly") else "readonly")
-                elif isinstance(widget, tk.Text):
-                    widget.configure(state=state)
-                else:
-                    try:
-                        widget.configure(state=state)
-                    except tk.TclError:
-                        pass
-        except Exception:
-            pass
-        if hasattr(widget, "winfo_children"):
-            for c in widget.winfo_children():
-                self._set_state_recursive(c, state)
+            await self._ensure_browser(opts)
+        except Exception as e:
+            self.log(f"[WARN] Browser pre-launch failed ({e}); will retry on Start.")
+
+    async def _shutdown_playwright(self):
+        async with self._get_browser_lock():
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+                self._browser = None
+            if self._pw is not None:
+                try:
+                    await self._pw.stop()
+                except Exception:
+                    pass
+                self._pw = None
 
-    def _worker_run(self, urls, opts: CaptureOptions):
+    async def _batch_main(self, urls, opts: CaptureOptions):
         def logcb(msg: str):
             self.log(msg)
 
-        async def _amain():
-            try:
-                await run_batch(
-                    urls,
-                    opts,
-                    logcb=logcb,
-                    prompt_captcha_dialog=self.prompt_captcha_dialog
-                )
-                logcb("All done.")
-            except Exception as e:
-                logcb(f"[FATAL] {e}")
-            finally:
-                self.after(0, lambda: self._set_controls_enabled(True))
-
-        asyncio.run(_amain())
+        try:
+            browser = await self._ensure_browser(opts)
+            await run_batch(
+                self._pw,
+                urls,
+                opts,
+                logcb=logcb,
+                prompt_captcha_dialog=self.prompt_captcha_dialog,
+                browser=browser,
+                progresscb=self._inc_progress,
+                stop_event=self.stop_flag,
+            )
+            logcb("Stopped." if self.stop_flag.is_set() else "All done.")
+        except Exception as e:
+            logcb(f"[FATAL] {e}")
+        finally:
+            self.after(0, lambda: self._set_controls_enabled(True))
+
+    def on_close(self):
+        self._closing = True
+        self.stop_flag.set()  # no new URLs (and so no new prompts) while shutting down
+        # Unblock capture waits on open CAPTCHA prompts; their executor threads are joined at exit.
+        for event, decision in list(self._captcha_pending.items()):
+            decision["action"] = "skip"
+            event.set()
+        self._captcha_pending.clear()
+        fut = asyncio.run_coroutine_threadsafe(self._shutdown_playwright(), self._loop)
+        try:
+            fut.result(timeout=10)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.destroy()
 
     def _inc_progress(self):
         def _update():
@@ -1015,17 +1565,34 @@ class App(tk.Tk):
 
     # Logging helpers
     def log(self, msg: str):
-        def _append():
-            self.log_text.config(state="normal")
-            self.log_text.insert("end", msg + "\n")
-            self.log_text.see("end")
-            self.log_text.config(state="disabled")
-        self.after(0, _append)
+        self._log_q.put(msg)
+
+    def _drain_log(self, max_batch: int = 500):
+        lines = []
+        try:
+            while len(lines) < max_batch:
+                lines.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            with self._editable(self.log_text):
+                self.log_text.insert("end", "\n".join(lines) + "\n")
+                self.log_text.see("end")
+        self.after(100, self._drain_log)
 
     def clear_log(self):
-        self.log_text.config(state="normal")
-        self.log_text.delete("1.0", "end")
-        self.log_text.config(state="disabled")
+        with self._editable(self.log_text):
+            self.log_text.delete("1.0", "end")
+
+    @staticmethod
+    @contextmanager
+    def _editable(widget):
+        """Make a read-only Text writable for the duration of the block."""
+        widget.config(state="normal")
+        try:
+            yield widget
+        finally:
+            widget.config(state="disabled")
 
 
 def main():